@@ -1,10 +1,19 @@
 import os
+import re
+import logging
 import abc
 import asyncio
 import time
-from typing import Dict, Any, List, Optional
+import hashlib
+import functools
+import uuid
+from html import unescape
+from io import StringIO
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 from bs4 import BeautifulSoup
+from cachetools import TTLCache
 from src.logger import log_usage
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 # Conditional import for Gemini to avoid crashing if dependency is missing during transition
 try:
@@ -14,14 +23,147 @@ try:
 except ImportError:
     HAS_GEMINI = False
 
-import ollama
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_result
+import httpx
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception, retry_if_result
+
+# HN comment markup is limited to <p>, <a>, <i>, <pre> and <code>, so a tag
+# stripper is enough; BeautifulSoup is only needed for script/style blocks.
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+# Static scaffolding of the report and chat prompts. Only the story-specific
+# pieces are interpolated per call, via "".join.
+_REPORT_PROMPT_HEAD = """
+        You are an expert tech analyst. Analyze this Hacker News submission. 
+        
+        Metadata:
+        Title: """
+_REPORT_PROMPT_URL = """
+        URL: """
+_REPORT_PROMPT_SCORE = """
+        Score: """
+_REPORT_PROMPT_ARTICLE = """
+        
+        Article Content (Excerpt):
+        """
+_REPORT_PROMPT_COMMENTS = """
+        
+        Top Comments:
+        """
+_REPORT_PROMPT_TASK = """
+        
+        Task:
+        Create a detailed Markdown summary. Use the following structure EXACTLY:
+        
+        # """
+_REPORT_PROMPT_SECTIONS = """
+        
+        ## 📝 Summary
+        (A concise 3-sentence summary of the article)
+        
+        ## ⚖️ Pro & Cons / Key Arguments
+        (Bulleted list of pros, cons, or key technical points discussed in article and comments)
+        
+        ## 💬 Community Sentiment
+        (What are the commenters saying? What is the controversy? What are the top insights?)
+        
+        ## 🧠 Hooks
+        (List 3 specific complex topics mentioned in this thread that the user might want to ask more about)
+        """
+
+_CHAT_CONTEXT_HEAD = """
+        This is the article:
+        ---
+        TITLE: """
+_CHAT_CONTEXT_CONTENT = """
+        CONTENT:
+        """
+_CHAT_CONTEXT_COMMENTS = """
+        ---
+        
+        And these are the comments (top 100 with hierarchy):
+        ---
+        """
+_CHAT_CONTEXT_TAIL = """
+        ---
+        """
+_CHAT_CONTEXT_ACK = "I have read the article and the comments. What would you like to know?"
+_CHAT_QUESTION_HEAD = """
+        The user wants to know more about: """
+_CHAT_PROMPT_TASK = """
+        
+        Task:
+        Provide a detailed, well-structured answer based strictly on the provided context. 
+        If the information is not in the article or comments, state that.
+        Use Markdown for structure.
+        """
+
+# Lifetime of provider-side caches of a story's chat context
+CONTEXT_CACHE_TTL_S = 3600
+# Story chat sessions kept in memory, each for as long as its provider cache
+SESSION_CACHE_SIZE = 8
+# How long Ollama keeps the model (and its prefix KV cache) loaded between turns
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Generated reports keyed by a digest of (model, prompt); the oldest entries
+# are pruned beyond REPORT_CACHE_MAX_ENTRIES
+REPORT_CACHE_DIR = os.path.join("cache", "reports")
+REPORT_CACHE_MAX_ENTRIES = 256
+
+# Indentation per comment depth; deeper threads fall back to '  ' * depth
+_INDENTS = ['', '  ', '    ', '      ', '        ', '          ']
+
+# Only overload, rate limiting and network trouble are worth retrying; auth
+# and validation errors fail on the first attempt.
+_TRANSIENT_STATUS = {408, 429}
+# Status-code text is only trusted at the start of the message ("503 UNAVAILABLE"),
+# never as any three-digit number (token counts, ports, sizes) inside it
+_TRANSIENT_RE = re.compile(r'^\s*(?:408|429|5\d\d)\b|\b(?:UNAVAILABLE|RESOURCE_EXHAUSTED|DEADLINE_EXCEEDED)\b')
+
+def _is_transient_status(code: int) -> bool:
+    return code in _TRANSIENT_STATUS or 500 <= code < 600
+
+def _is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    # genai APIError carries .code, ollama ResponseError .status_code
+    for attr in ('code', 'status_code'):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return _is_transient_status(code)
+    # Errors without a status code: fall back to the status text they carry
+    return bool(_TRANSIENT_RE.search(str(exc)))
+
+@functools.lru_cache(maxsize=4096)
+def _clean_html_cached(html: str) -> str:
+    """
+    Converts comment HTML to plain text. Memoized so repeated chat turns
+    over the same story don't re-clean identical comment bodies.
+    """
+    if '<script' in html or '<style' in html:
+        soup = BeautifulSoup(html, 'lxml')
+        return soup.get_text(separator=' ', strip=True)
+    return _WS_RE.sub(' ', unescape(_TAG_RE.sub(' ', html))).strip()
+
+class StorySession:
+    """
+    Chat context for one story. The article + comments block is sent as the
+    first turn of every chat, so providers can reuse it as a cached prefix.
+    """
+    def __init__(self, story_id: Any, prefix: List[Dict[str, str]]):
+        self.story_id = story_id
+        self.prefix = prefix
+        # Provider-specific cache handles, e.g. Gemini cached content names
+        self.provider_state: Dict[str, Any] = {}
 
 class LLMProvider(abc.ABC):
     @abc.abstractmethod
-    async def chat(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def chat(self, messages: List[Dict[str, str]], session: Optional[StorySession] = None) -> Dict[str, Any]:
         """
         Sends a chat request to the LLM.
+        If a session is given, messages start with session.prefix.
         Returns a dict with 'content' (str) and usage stats.
         """
         pass
@@ -30,10 +172,13 @@ class OllamaProvider(LLMProvider):
     def __init__(self, host: str, model: str):
         self.host = host
         self.model = model
+        import ollama  # lazy import
         self.client = ollama.AsyncClient(host=self.host)
 
-    async def chat(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        response = await self.client.chat(model=self.model, messages=messages)
+    async def chat(self, messages: List[Dict[str, str]], session: Optional[StorySession] = None) -> Dict[str, Any]:
+        # Ollama reuses the KV cache of a matching message prefix while the
+        # model stays loaded, so the story context is only prefilled once.
+        response = await self.client.chat(model=self.model, messages=messages, keep_alive=OLLAMA_KEEP_ALIVE)
         return {
             'content': response['message']['content'],
             'usage': {
@@ -44,13 +189,15 @@ class OllamaProvider(LLMProvider):
         }
 
 class GeminiProvider(LLMProvider):
-    def __init__(self, api_key: str, model_name: str = "gemini-3-flash-preview"):
+    def __init__(self, api_key: str, model_name: str = "gemini-3-flash-preview", breaker: Optional[CircuitBreaker] = None):
         if not HAS_GEMINI:
             raise ImportError("google-genai package is not installed.")
         self.client = genai.Client(api_key=api_key)
         self.model = model_name
+        # Counts chat calls that failed transiently after all their retries
+        self._breaker = breaker or CircuitBreaker()
 
-    async def chat(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _to_contents(self, messages: List[Dict[str, str]]) -> list:
         # Convert OpenAI/Ollama style messages to Gemini history
         # New SDK supports 'user' and 'model' roles.
         
@@ -71,6 +218,88 @@ class GeminiProvider(LLMProvider):
                 role=role,
                 parts=[types.Part.from_text(text=content)]
             ))
+        return gemini_contents
+
+    async def _context_cache(self, session: StorySession) -> Optional[str]:
+        """
+        Returns the name of a Gemini cached-content entry holding the session
+        prefix, creating it on first use. None if caching isn't available.
+        """
+        key = f"gemini:{self.model}"
+        state = session.provider_state.get(key)
+        now = time.monotonic()
+        if state is not None and (state['name'] is None or state['expires'] > now):
+            return state['name']
+        
+        try:
+            cache = await self.client.aio.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    contents=self._to_contents(session.prefix),
+                    ttl=f"{CONTEXT_CACHE_TTL_S}s",
+                )
+            )
+            name = cache.name
+        except Exception as e:
+            # e.g. context below the model's minimum cache size: send it inline
+            logging.info(f"Gemini context cache unavailable, sending context inline: {e}")
+            name = None
+        
+        # Refresh a minute early so a turn never references an expired cache
+        session.provider_state[key] = {'name': name, 'expires': now + CONTEXT_CACHE_TTL_S - 60}
+        return name
+
+    # Defined once on the class so the retry policy is built at import time;
+    # tenacity copies it per call, keeping concurrent calls independent.
+    @retry(
+        stop=stop_after_attempt(3),
+        # Jittered backoff (1s, 2s, ... capped at 30s) so concurrent calls don't retry in lockstep
+        wait=wait_exponential_jitter(initial=1, max=30, jitter=0.5),
+        retry=retry_if_exception(_is_transient),
+        reraise=True
+    )
+    async def _generate(self, contents: list, config):
+        return await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=config
+        )
+
+    async def chat(self, messages: List[Dict[str, str]], session: Optional[StorySession] = None) -> Dict[str, Any]:
+        self._breaker.before_call()
+        try:
+            result = await self._chat(messages, session)
+        except Exception as e:
+            if _is_transient(e):
+                self._breaker.record_failure()
+            else:
+                # The API answered (e.g. a 4xx for this request): it is up
+                self._breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled: no verdict, so the next call gets to be the trial
+            self._breaker.release_trial()
+            raise
+        self._breaker.record_success()
+        return result
+
+    async def _chat(self, messages: List[Dict[str, str]], session: Optional[StorySession]) -> Dict[str, Any]:
+        cache_name = None
+        if session is not None:
+            cache_name = await self._context_cache(session)
+            if cache_name:
+                # The cached prefix replaces the leading context turns
+                messages = messages[len(session.prefix):]
+        
+        # One request id per logical call, reused by every retry below, so
+        # the attempts of a call can be recognised as the same request
+        request_id = uuid.uuid4().hex
+        config = types.GenerateContentConfig(
+            cached_content=cache_name,
+            http_options=types.HttpOptions(headers={"x-request-id": request_id}),
+        )
+        
+        gemini_contents = self._to_contents(messages)
 
         # The new SDK is sync by default but has async support via http_options?
         # Actually checking docs, V1 beta SDK had async_generate_content.
@@ -78,20 +307,7 @@ class GeminiProvider(LLMProvider):
         # It seems `client.aio.models.generate_content` is the way.
         
         start_time = time.perf_counter()
-        
-        @retry(
-            stop=stop_after_attempt(3),
-            wait=wait_exponential(multiplier=1, min=2, max=10),
-            retry=retry_if_exception_type(Exception), # Be broad for now as we don't know the exact class
-            reraise=True
-        )
-        async def _generate():
-            return await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=gemini_contents
-            )
-            
-        response = await _generate()
+        response = await self._generate(gemini_contents, config)
         duration = time.perf_counter() - start_time
         
         usage = response.usage_metadata
@@ -108,8 +324,10 @@ class GeminiProvider(LLMProvider):
         }
 
 class Analyzer:
-    def __init__(self):
+    def __init__(self, cache_dir: str = REPORT_CACHE_DIR):
         self._provider = None
+        self._cache_dir = cache_dir
+        self._sessions: TTLCache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=CONTEXT_CACHE_TTL_S)
 
     @property
     def provider(self) -> LLMProvider:
@@ -131,6 +349,8 @@ class Analyzer:
             # Default to Ollama
             host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
             model = os.getenv("OLLAMA_MODEL", "llama3")
+            return OllamaProvider(host=host, model=model)
+
     def set_provider(self, provider_type: str, **kwargs) -> bool:
         """
         Dynamically sets the LLM provider.
@@ -146,7 +366,11 @@ class Analyzer:
             elif provider_type == "ollama":
                 host = kwargs.get("host") or os.getenv("OLLAMA_HOST", "http://localhost:11434")
                 model = kwargs.get("model") or os.getenv("OLLAMA_MODEL", "llama3")
-                self._provider = OllamaProvider(host=host, model=model)
+                if isinstance(self._provider, OllamaProvider) and self._provider.host == host:
+                    # Same server: keep the existing AsyncClient and its open connections
+                    self._provider.model = model
+                else:
+                    self._provider = OllamaProvider(host=host, model=model)
             else:
                 return False
                 
@@ -166,53 +390,77 @@ class Analyzer:
     def _clean_html(self, html: str) -> str:
         if not html:
             return ""
-        soup = BeautifulSoup(html, 'html.parser')
-        return soup.get_text(separator=' ', strip=True)
+        return _clean_html_cached(html)
 
-    async def generate_report(self, story: Dict[str, Any], article_text: str, comments: List[Dict[str, Any]]) -> str:
-        """
-        Generates a comprehensive markdown report for a story.
-        """
-        
-        # Prepare context data
-        comment_text = "\n".join([
+    def _report_cache_path(self, model: str, prompt: str) -> str:
+        key = hashlib.blake2b(f"{model}\0{prompt}".encode("utf-8"), digest_size=20).hexdigest()
+        return os.path.join(self._cache_dir, f"{key}.md")
+
+    def _load_cached_report(self, path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store_cached_report(self, path: str, content: str):
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        except OSError as e:
+            logging.warning(f"Failed to cache report: {e}")
+            return
+        self._prune_report_cache()
+
+    def _prune_report_cache(self):
+        try:
+            with os.scandir(self._cache_dir) as it:
+                entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".md")]
+        except OSError:
+            return
+        if len(entries) <= REPORT_CACHE_MAX_ENTRIES:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - REPORT_CACHE_MAX_ENTRIES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _format_report_comments(self, comments: List[Dict[str, Any]]) -> str:
+        return "\n".join([
             f"- {c.get('by', 'anon')}: {self._clean_html(c.get('text', ''))}" 
             for c in comments[:30] 
         ])
+
+    async def generate_report(self, story: Dict[str, Any], article_text: str, comments: List[Dict[str, Any]], use_cache: bool = True) -> str:
+        """
+        Generates a comprehensive markdown report for a story. With
+        use_cache=False the cached report is skipped and replaced by the new one.
+        """
         
-        prompt = f"""
-        You are an expert tech analyst. Analyze this Hacker News submission. 
-        
-        Metadata:
-        Title: {story.get('title')}
-        URL: {story.get('url')}
-        Score: {story.get('score')}
-        
-        Article Content (Excerpt):
-        {article_text[:4000]}
-        
-        Top Comments:
-        {comment_text}
-        
-        Task:
-        Create a detailed Markdown summary. Use the following structure EXACTLY:
-        
-        # {story.get('title')}
-        
-        ## 📝 Summary
-        (A concise 3-sentence summary of the article)
-        
-        ## ⚖️ Pro & Cons / Key Arguments
-        (Bulleted list of pros, cons, or key technical points discussed in article and comments)
-        
-        ## 💬 Community Sentiment
-        (What are the commenters saying? What is the controversy? What are the top insights?)
+        # Prepare context data (HTML cleaning runs off the event loop)
+        comment_text = await asyncio.to_thread(self._format_report_comments, comments)
         
-        ## 🧠 Hooks
-        (List 3 specific complex topics mentioned in this thread that the user might want to ask more about)
-        """
+        title = str(story.get('title'))
+        prompt = "".join([
+            _REPORT_PROMPT_HEAD, title,
+            _REPORT_PROMPT_URL, str(story.get('url')),
+            _REPORT_PROMPT_SCORE, str(story.get('score')),
+            _REPORT_PROMPT_ARTICLE, article_text[:4000],
+            _REPORT_PROMPT_COMMENTS, comment_text,
+            _REPORT_PROMPT_TASK, title,
+            _REPORT_PROMPT_SECTIONS,
+        ])
         
         try:
+            # Identical prompt + model means nothing changed: reuse the last report
+            cache_path = self._report_cache_path(getattr(self.provider, 'model', 'unknown'), prompt)
+            cached = self._load_cached_report(cache_path) if use_cache else None
+            if cached is not None:
+                return cached
+
             response = await self.provider.chat(messages=[
                 {'role': 'user', 'content': prompt}
             ])
@@ -226,54 +474,81 @@ class Analyzer:
                 operation_type="report_generation"
             )
             
+            await asyncio.to_thread(self._store_cached_report, cache_path, response['content'])
             return response['content']
         except Exception as e:
             return f"ANALYSIS_ERROR: {str(e)}"
 
-    async def chat_with_context(self, story: Dict[str, Any], article_text: str, comments: List[Dict[str, Any]], question: str, history: List[Dict[str, str]] = None) -> str:
+    def _format_comments(self, comments: List[Dict[str, Any]]) -> str:
+        # Format comments with indentation based on depth
+        buf = StringIO()
+        clean = self._clean_html
+        for i, c in enumerate(comments[:100]):
+            g = c.get
+            depth = g("depth", 0)
+            if i:
+                buf.write("\n")
+            buf.write(_INDENTS[depth] if depth < len(_INDENTS) else "  " * depth)
+            buf.write("- ")
+            buf.write(g("by", "anon"))
+            buf.write(": ")
+            buf.write(clean(g("text", "")))
+        
+        return buf.getvalue()
+
+    def begin_story_session(self, story: Dict[str, Any], article_text: str, comments: List[Dict[str, Any]]) -> StorySession:
+        """
+        Builds the immutable chat context for a story once. Subsequent
+        chat_with_context calls reuse it as a stable prefix so providers
+        can serve it from their prompt caches instead of re-reading it.
+        """
+        session = self._build_story_session(story, article_text, comments)
+        self._sessions[session.story_id] = session
+        return session
+
+    def _build_story_session(self, story: Dict[str, Any], article_text: str, comments: List[Dict[str, Any]]) -> StorySession:
+        # Touches no shared state, so it can run in a worker thread
+        context = "".join([
+            _CHAT_CONTEXT_HEAD, str(story.get('title')),
+            _CHAT_CONTEXT_CONTENT, article_text[:12000],
+            _CHAT_CONTEXT_COMMENTS, self._format_comments(comments),
+            _CHAT_CONTEXT_TAIL,
+        ])
+        return StorySession(story.get('id'), [
+            {'role': 'user', 'content': context},
+            {'role': 'assistant', 'content': _CHAT_CONTEXT_ACK},
+        ])
+
+    def drop_story_session(self, story_id: Any):
+        """Forgets a story's session, e.g. after its article and comments were refetched."""
+        self._sessions.pop(story_id, None)
+
+    async def chat_with_context(self, story: Dict[str, Any], article_text: Optional[str], comments: Optional[List[Dict[str, Any]]], question: str, history: List[Dict[str, str]] = None, session: Optional[StorySession] = None, context_loader: Optional[Callable[[], Awaitable[Tuple[str, List[Dict[str, Any]]]]]] = None) -> str:
         """
         Answers a specific question based on the full context using a structured prompt.
+        If article_text and comments are not held by the caller, context_loader
+        is awaited for them, only when the story has no session yet.
         """
-        # Format comments with indentation based on depth
-        formatted_comments = []
-        for c in comments[:100]:
-            depth = c.get("depth", 0)
-            indent = "  " * depth
-            author = c.get("by", "anon")
-            text = self._clean_html(c.get("text", ""))
-            formatted_comments.append(f"{indent}- {author}: {text}")
-        
-        comment_block = "\n".join(formatted_comments)
-        
-        prompt = f"""
-        This is the article:
-        ---
-        TITLE: {story.get('title')}
-        CONTENT:
-        {article_text[:12000]}
-        ---
-        
-        And these are the comments (top 100 with hierarchy):
-        ---
-        {comment_block}
-        ---
+        if session is None:
+            session = self._sessions.get(story.get('id'))
+        if session is None:
+            if context_loader is not None:
+                article_text, comments = await context_loader()
+            # Cleaning up to 100 comments is CPU work; keep it off the event loop.
+            # The session cache isn't thread-safe, so it is only updated here.
+            session = await asyncio.to_thread(self._build_story_session, story, article_text, comments)
+            self._sessions[session.story_id] = session
         
-        The user wants to know more about: {question}
-        
-        Task:
-        Provide a detailed, well-structured answer based strictly on the provided context. 
-        If the information is not in the article or comments, state that.
-        Use Markdown for structure.
-        """
+        prompt = "".join([_CHAT_QUESTION_HEAD, question, _CHAT_PROMPT_TASK])
         
-        messages = []
+        messages = list(session.prefix)
         if history:
             messages.extend(history)
         
         messages.append({'role': 'user', 'content': prompt})
         
         try:
-            response = await self.provider.chat(messages=messages)
+            response = await self.provider.chat(messages=messages, session=session)
             
             # Log Usage
             log_usage(
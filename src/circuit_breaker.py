@@ -0,0 +1,61 @@
+import time
+from typing import Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast once a dependency keeps failing.
+
+    The circuit opens after `failure_threshold` consecutive failures; while
+    open, before_call() raises CircuitOpenError without touching the
+    dependency. Once `reset_timeout` seconds have passed the circuit is
+    half-open: a single trial call is let through, and its outcome either
+    closes the circuit again or re-opens it for another timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(f"Circuit open after {self._failures} consecutive failures; retrying in {remaining:.0f}s")
+        if state == "half-open":
+            # Re-arm the timeout so concurrent callers keep failing fast
+            # while the trial call is in flight
+            self._opened_at = time.monotonic()
+            self._trial = True
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def release_trial(self):
+        """Gives up an in-flight trial without a verdict; the next call becomes the trial."""
+        if self._trial:
+            self._trial = False
+            self._opened_at = time.monotonic() - self.reset_timeout
+
+    def record_failure(self):
+        self._failures += 1
+        if self._trial or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._trial = False
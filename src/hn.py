@@ -1,75 +1,266 @@
 import httpx
+import time
 import asyncio
-from typing import List, Dict, Any, Optional
+from collections import deque
+import orjson
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import trafilatura
+from cachetools import TLRUCache
 
 HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
+# Upper bound on concurrent requests to the HN API per client
+MAX_CONCURRENT_REQUESTS = 50
+# Item cache TTLs (seconds): stories change as they get voted on, comment
+# bodies are effectively immutable once posted.
+ITEM_CACHE_SIZE = 5000
+STORY_TTL = 300
+COMMENT_TTL = 3600
+# Article pages larger than this are truncated before extraction
+MAX_ARTICLE_BYTES = 512 * 1024
+ARTICLE_TEXT_LIMIT = 20000
+PLAIN_TEXT_TYPES = ("text/plain", "text/markdown")
+# Comment trees are fetched through a FetchPool of this size and rate, and
+# cache misses are gathered at most ITEM_BATCH_SIZE at a time
+COMMENT_CONCURRENCY = 16
+COMMENT_RATE = 50.0
+ITEM_BATCH_SIZE = 16
+
+_SSL_CONTEXT = None
+
+def _ssl_context():
+    """One SSL context (CA bundle loaded once) for every HNClient."""
+    global _SSL_CONTEXT
+    if _SSL_CONTEXT is None:
+        _SSL_CONTEXT = httpx.create_ssl_context()
+    return _SSL_CONTEXT
+
+def _item_ttu(_key: int, item: Dict[str, Any], now: float) -> float:
+    return now + (COMMENT_TTL if item.get("type") == "comment" else STORY_TTL)
+
+class FetchPool:
+    """
+    Async context manager bounding concurrent requests (semaphore) and their
+    rate (token bucket refilled at `rate` per second, holding up to `rate`).
+    """
+    def __init__(self, size: int = COMMENT_CONCURRENCY, rate: float = COMMENT_RATE):
+        self._semaphore = asyncio.Semaphore(size)
+        self._rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._rate, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
 
 class HNClient:
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0, follow_redirects=True)
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        # One pooled client per HNClient: top stories fan out into ~50
+        # concurrent item requests against the same Firebase host, which
+        # HTTP/2 multiplexes over a single TLS connection. Article fetches
+        # share it too, keeping connections to hosts that are linked often.
+        self.client = httpx.AsyncClient(
+            http2=True,
+            verify=_ssl_context(),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=100, keepalive_expiry=30.0),
+            # e.g. httpx.MockTransport in tests; replaces the pooled HTTP/2 transport
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._item_cache = TLRUCache(maxsize=ITEM_CACHE_SIZE, ttu=_item_ttu)
+        # Item requests currently on the wire, shared by concurrent callers
+        self._inflight: Dict[int, asyncio.Task] = {}
+        # Default bound for comment-tree fetches, shared by every story
+        self._comment_pool = FetchPool()
+        # At most one background fetch of the page after the last one viewed:
+        # page -> (limit, started_at, task)
+        self._prefetch: Dict[int, tuple] = {}
 
     async def close(self):
+        self._cancel_prefetch()
         await self.client.aclose()
 
-    async def fetch_item(self, item_id: int) -> Dict[str, Any]:
+    async def __aenter__(self) -> "HNClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _cancel_prefetch(self):
+        for _, _, task in self._prefetch.values():
+            task.cancel()
+        self._prefetch.clear()
+
+    def _schedule_prefetch(self, page: int, limit: int):
+        self._cancel_prefetch()
+        task = asyncio.create_task(self._collect_page(page, limit))
+        self._prefetch[page] = (limit, time.monotonic(), task)
+
+    def _take_prefetch(self, page: int, limit: int) -> Optional[asyncio.Task]:
+        entry = self._prefetch.pop(page, None)
+        if entry is None:
+            return None
+        entry_limit, started_at, task = entry
+        # Stale or differently-sized pages are refetched
+        if entry_limit != limit or time.monotonic() - started_at > STORY_TTL:
+            task.cancel()
+            return None
+        return task
+
+    async def fetch_item(self, item_id: int, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Returns an item, from the TLRU cache when fresh. use_cache=False
+        always goes to the network (joining a request already in flight)
+        and refreshes the cached copy.
+        """
+        cached = self._item_cache.get(item_id) if use_cache else None
+        if cached is not None:
+            return cached
+        task = self._inflight.get(item_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load_item(item_id))
+            self._inflight[item_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(item_id, None))
+        # Shielded so one caller giving up doesn't cancel the others' request
+        return await asyncio.shield(task)
+
+    async def _load_item(self, item_id: int) -> Dict[str, Any]:
         try:
-            response = await self.client.get(f"{HN_API_BASE}/item/{item_id}.json")
+            async with self._semaphore:
+                response = await self.client.get(f"{HN_API_BASE}/item/{item_id}.json")
             response.raise_for_status()
-            return response.json()
+            item = orjson.loads(response.content)
+            if item:
+                self._item_cache[item_id] = item
+            return item
         except Exception as e:
             print(f"Error fetching item {item_id}: {e}")
             return {}
 
-    async def fetch_top_stories(self, page: int = 1, limit: int = 50) -> List[Dict[str, Any]]:
+    async def fetch_items_many(self, item_ids: List[int], concurrency: Optional[FetchPool] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches several items, only hitting the network for cache misses.
+        Misses are gathered ITEM_BATCH_SIZE at a time, each request going
+        through `concurrency` when given. Results keep the order of item_ids.
+        """
+        results = [self._item_cache.get(id) for id in item_ids]
+        misses = [i for i, item in enumerate(results) if item is None]
+        for start in range(0, len(misses), ITEM_BATCH_SIZE):
+            batch = misses[start:start + ITEM_BATCH_SIZE]
+            fetched = await asyncio.gather(*[self._fetch_item_in(item_ids[i], concurrency) for i in batch])
+            for i, item in zip(batch, fetched):
+                results[i] = item
+        return results
+
+    async def _fetch_item_in(self, item_id: int, concurrency: Optional[FetchPool]) -> Dict[str, Any]:
+        if concurrency is None:
+            return await self.fetch_item(item_id)
+        async with concurrency:
+            return await self.fetch_item(item_id)
+
+    async def fetch_top_stories(self, page: int = 1, limit: int = 50, refresh: bool = False) -> List[Dict[str, Any]]:
+        return [story async for story in self.fetch_top_stories_iter(page=page, limit=limit, refresh=refresh)]
+
+    async def fetch_top_stories_iter(self, page: int = 1, limit: int = 50, refresh: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields top stories in rank order as soon as each one (and every
+        story ranked above it) has arrived. All item requests run concurrently.
+        Once the page is consumed, the next page is prefetched in the background.
+        With refresh=True, prefetched and cached stories are bypassed so scores
+        and comment counts are current.
+        """
+        prefetched = None if refresh else self._take_prefetch(page, limit)
+        if prefetched is not None:
+            for story in await prefetched:
+                yield story
+        else:
+            async for story in self._iter_page(page, limit, use_cache=not refresh):
+                yield story
+        
+        self._schedule_prefetch(page + 1, limit)
+
+    async def _collect_page(self, page: int, limit: int) -> List[Dict[str, Any]]:
+        return [story async for story in self._iter_page(page, limit)]
+
+    async def _iter_page(self, page: int, limit: int, use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
         try:
             response = await self.client.get(f"{HN_API_BASE}/topstories.json")
             response.raise_for_status()
-            all_ids = response.json()
-            
-            start = (page - 1) * limit
-            end = start + limit
-            ids = all_ids[start:end]
-            
-            tasks = [self.fetch_item(id) for id in ids]
-            stories = await asyncio.gather(*tasks)
-            return [s for s in stories if s]
+            all_ids = orjson.loads(response.content)
         except Exception as e:
             print(f"Error fetching top stories: {e}")
-            return []
+            return
+        
+        start = (page - 1) * limit
+        end = start + limit
+        ids = all_ids[start:end]
+        
+        tasks = [asyncio.ensure_future(self.fetch_item(id, use_cache)) for id in ids]
+        try:
+            for task in tasks:
+                story = await task
+                if story:
+                    yield story
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    async def fetch_comments(self, item_ids: List[int], limit: int = 100) -> List[Dict[str, Any]]:
+    async def fetch_comments(self, item_ids: List[int], limit: int = 100, concurrency: Optional[FetchPool] = None) -> List[Dict[str, Any]]:
         """
         BFS traversal to fetch comments up to a limit.
+        Each round fetches as much of the frontier as the remaining limit allows,
+        bounded by `concurrency` (the client's comment pool by default).
         """
+        if concurrency is None:
+            concurrency = self._comment_pool
         comments = []
-        queue = [(id, 0) for id in item_ids] # (id, depth)
-        fetched_count = 0
+        frontier = deque((id, 0) for id in item_ids) # (id, depth)
 
-        while queue and fetched_count < limit:
-            batch_with_depth = queue[:10]
-            queue = queue[10:]
+        while frontier and len(comments) < limit:
+            batch_with_depth = [frontier.popleft() for _ in range(min(limit - len(comments), len(frontier)))]
             
-            tasks = [self.fetch_item(pair[0]) for pair in batch_with_depth]
-            results = await asyncio.gather(*tasks)
+            results = await self.fetch_items_many([pair[0] for pair in batch_with_depth], concurrency)
             
-            for i, res in enumerate(results):
+            for (_, depth), res in zip(batch_with_depth, results):
                 if not res or res.get("deleted") or res.get("dead"):
                     continue
                 
-                depth = batch_with_depth[i][1]
-                res["depth"] = depth
+                # Annotate a copy: the dict itself is shared through the item cache
+                res = {**res, "depth": depth}
                 comments.append(res)
-                fetched_count += 1
                 
                 if "kids" in res:
-                    queue.extend([(kid_id, depth + 1) for kid_id in res["kids"]])
-                    
-                if fetched_count >= limit:
-                    break
+                    frontier.extend((kid_id, depth + 1) for kid_id in res["kids"])
         
         return comments
 
+    async def fetch_story_bundle(self, story: Dict[str, Any], comment_limit: int = 100, concurrency: Optional[FetchPool] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Fetches a story's article text and comments concurrently.
+        """
+        article_task = asyncio.create_task(self.fetch_article_text(story.get("url", "")))
+        comments_task = asyncio.create_task(self.fetch_comments(story.get("kids", []), limit=comment_limit, concurrency=concurrency))
+        return await article_task, await comments_task
+
     async def fetch_article_text(self, url: str) -> str:
         if not url:
             return "No URL provided."
@@ -86,17 +277,21 @@ class HNClient:
             response = await self.client.get(url, headers=headers)
             response.raise_for_status()
             
-            extracted_text = trafilatura.extract(response.text, include_links=True, include_comments=False)
+            body = response.content[:MAX_ARTICLE_BYTES].decode(response.charset_encoding or "utf-8", errors="ignore")
+            
+            # Raw pastes / markdown files are already readable, skip HTML extraction
+            content_type = response.headers.get("content-type", "").lower()
+            if content_type.startswith(PLAIN_TEXT_TYPES):
+                return body[:ARTICLE_TEXT_LIMIT]
+            
+            # fast=True skips trafilatura's slow readability/justext fallbacks
+            extracted_text = trafilatura.extract(body, include_links=True, include_comments=False, favor_precision=False, fast=True)
             
             if extracted_text:
                  # Truncate if too long (approx 20k chars)
-                return extracted_text[:20000]
+                return extracted_text[:ARTICLE_TEXT_LIMIT]
             else:
                  return "Could not extract article text."
 
         except Exception as e:
             return f"Failed to extract text: {e}"
-
-# Singleton instance helper if needed
-async def get_hn_client():
-    return HNClient()
@@ -1,48 +1,165 @@
 import logging
+import logging.handlers
 import os
+import io
 import csv
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime
+from typing import Optional
 
 # Define log directories
 LOG_DIR = "logs"
 APP_LOG_DIR = os.path.join(LOG_DIR, "app")
+APP_LOG_PATH = os.path.join(APP_LOG_DIR, "app.log")
 STATS_LOG_DIR = os.path.join(LOG_DIR, "stats")
 STATS_FILE = os.path.join(STATS_LOG_DIR, "usage_stats.csv")
+STATS_HEADER = "Timestamp,Model,Input Tokens,Output Tokens,Duration (s),Type\n"
 
-def setup_logging():
-    """Configures the logging system."""
+# Usage rows are queued by log_usage and written in batches by a background thread
+FLUSH_INTERVAL_S = 0.5
+_usage_queue: "queue.Queue[str]" = queue.Queue()
+_flush_lock = threading.Lock()
+_flush_thread = None
+# Writes app.log records handed off by the root logger's QueueHandler
+_log_listener = None
+# Append handle for STATS_FILE, opened on the first flush and kept open
+_stats_fh = None
+
+def setup_logging(log_dir: Optional[str] = None):
+    """
+    Configures the logging system. `log_dir` replaces the default `logs/`
+    root, e.g. so parallel test workers each write to their own directory.
+    """
+    global _log_listener
+    
+    if log_dir is not None:
+        _set_log_dir(log_dir)
     
     # Create directories if they don't exist
     for directory in [APP_LOG_DIR, STATS_LOG_DIR]:
         if not os.path.exists(directory):
             os.makedirs(directory)
             
-    # Configure root logger to write to file
-    log_file = os.path.join(APP_LOG_DIR, "app.log")
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=[
-            logging.FileHandler(log_file),
-            # We explicitly do NOT add StreamHandler here to avoid messing up the TUI
-        ]
-    )
+    # Configure root logger to write to file. Records are only enqueued by the
+    # caller; a listener thread does the disk IO off the event loop.
+    file_handler = logging.FileHandler(APP_LOG_PATH)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+    if _log_listener is not None:
+        # Already set up: point the listener at the (possibly new) log file
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener.handlers = (file_handler,)
+        _log_listener.start()
+    else:
+        log_queue = queue.SimpleQueue()
+        _log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+        # Added directly rather than via basicConfig, which is a no-op once
+        # anything else has put a handler on the root logger
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        # We explicitly do NOT add StreamHandler here to avoid messing up the TUI
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
     
-    # Initialize stats file with header if it doesn't exist
-    if not os.path.exists(STATS_FILE):
-        with open(STATS_FILE, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Timestamp", "Model", "Input Tokens", "Output Tokens", "Duration (s)", "Type"])
+    _ensure_stats_file()
+
+    _ensure_flush_thread()
 
     logging.info("Logging initialized.")
 
+def _ensure_flush_thread():
+    """Starts the background CSV flush (and its exit hook) once per process."""
+    global _flush_thread
+    if _flush_thread is not None:
+        return
+    with _flush_lock:
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(target=_flush_loop, name="usage-stats-flush", daemon=True)
+            _flush_thread.start()
+            atexit.register(_close_stats)
+
+def _ensure_stats_file():
+    """Opens the stats append handle, writing the header into a new file."""
+    global _stats_fh
+    with _flush_lock:
+        if _stats_fh is None:
+            _stats_fh = open(STATS_FILE, 'a', buffering=1 << 16, newline='')
+        # An append handle starts at the end, so position 0 means an empty file
+        if _stats_fh.tell() == 0:
+            _stats_fh.write(STATS_HEADER)
+            _stats_fh.flush()
+
+def _set_log_dir(log_dir: str):
+    global LOG_DIR, APP_LOG_DIR, APP_LOG_PATH, STATS_LOG_DIR, STATS_FILE, _stats_fh
+    with _flush_lock:
+        # Rows still queued are written to the new directory's stats file
+        if _stats_fh is not None:
+            _stats_fh.close()
+            _stats_fh = None
+        LOG_DIR = log_dir
+        APP_LOG_DIR = os.path.join(LOG_DIR, "app")
+        APP_LOG_PATH = os.path.join(APP_LOG_DIR, "app.log")
+        STATS_LOG_DIR = os.path.join(LOG_DIR, "stats")
+        STATS_FILE = os.path.join(STATS_LOG_DIR, "usage_stats.csv")
+
+def flush_logs():
+    """Blocks until every queued app.log record has been written."""
+    if _log_listener is not None:
+        # stop() drains the queue and joins the listener thread
+        _log_listener.stop()
+        _log_listener.start()
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL_S)
+        flush_usage()
+
+def flush_usage():
+    """Writes all queued usage rows to the stats CSV in one append."""
+    global _stats_fh
+    with _flush_lock:
+        lines = []
+        while True:
+            try:
+                lines.append(_usage_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not lines:
+            return
+        try:
+            if _stats_fh is None:
+                _stats_fh = open(STATS_FILE, 'a', buffering=1 << 16, newline='')
+            _stats_fh.write("".join(lines))
+            _stats_fh.flush()
+        except Exception as e:
+            logging.error(f"Failed to log usage stats: {e}")
+
+def _close_stats():
+    global _stats_fh
+    flush_usage()
+    with _flush_lock:
+        if _stats_fh is not None:
+            _stats_fh.close()
+            _stats_fh = None
+
 def log_usage(model: str, input_tokens: int, output_tokens: int, duration_s: float, operation_type: str = "generation"):
-    """Logs token usage stats to CSV."""
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(STATS_FILE, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, model, input_tokens, output_tokens, f"{duration_s:.2f}", operation_type])
-    except Exception as e:
-        logging.error(f"Failed to log usage stats: {e}")
+    """Queues token usage stats for the next CSV flush."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if _needs_quoting(model) or _needs_quoting(operation_type):
+        # Rare: let the csv module handle quoting for free-form strings
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerow([timestamp, model, input_tokens, output_tokens, f"{duration_s:.2f}", operation_type])
+        line = buf.getvalue()
+    else:
+        line = f"{timestamp},{model},{input_tokens},{output_tokens},{duration_s:.2f},{operation_type}\n"
+    _usage_queue.put(line)
+    # Callers that never ran setup_logging still get their rows written
+    _ensure_flush_thread()
+
+def _needs_quoting(value: str) -> bool:
+    return any(ch in value for ch in ',"\r\n')
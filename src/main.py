@@ -5,8 +5,6 @@ from dotenv import load_dotenv
 # Load environment variables before importing other modules
 load_dotenv()
 
-import ollama
-from src.tui import HNApp
 from src.logger import setup_logging
 
 def check_provider():
@@ -31,6 +29,8 @@ def check_provider():
     elif provider == "ollama":
         model_name = os.getenv("OLLAMA_MODEL", "llama3")
         try:
+            # Imported here so Gemini users don't pay for the ollama import graph
+            import ollama
             client = ollama.Client()
             response = client.list()
             
@@ -73,7 +73,8 @@ def main():
         if choice.lower() != 'y':
             sys.exit(1)
 
-    # Start the Textual App
+    # Start the Textual App (imported late: Textual is slow to import)
+    from src.tui import HNApp
     app = HNApp()
     app.run()
 
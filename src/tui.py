@@ -6,16 +6,207 @@ from textual import on, work
 from textual.binding import Binding
 from rich.markup import escape
 from rich.markdown import Markdown as RichMarkdown
+from markdown_it import MarkdownIt
 
 import asyncio
-import json
+import functools
+import orjson
 import os
-import glob
+import re
 import datetime
 import logging
+from typing import Dict, List, Optional, Set, Tuple
 from src.hn import HNClient
 from src.analyze import analyzer
 
+# Display name of the active LLM provider; refreshed when Settings switches it
+_PROVIDER_NAME = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
+
+def _refresh_provider_name() -> None:
+    global _PROVIDER_NAME
+    _PROVIDER_NAME = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
+
+# Rows added to the dashboard table between event-loop yields
+ROW_CHUNK = 10
+
+def _story_row(rank: int, story: dict) -> tuple:
+    """Precomputes the display cells of one dashboard row and its key (the story id)."""
+    sid = str(story.get("id"))
+    return (
+        str(rank),
+        str(story.get("score", 0)),
+        story.get("title", "No Title"),
+        str(story.get("descendants", 0)),
+        sid,
+    ), sid
+
+@functools.lru_cache(maxsize=256)
+def _chat_markdown(content: str) -> RichMarkdown:
+    """Parses an assistant message once; the renderable is reused on every replay."""
+    return RichMarkdown(content)
+
+@functools.lru_cache(maxsize=32)
+def _markdown_tokens(markdown: str) -> list:
+    return MarkdownIt("gfm-like").parse(markdown)
+
+class _CachedMarkdownParser:
+    """
+    Parser for Textual's Markdown widget (via parser_factory) that reuses the
+    tokens of documents it has already parsed, e.g. a report opened again.
+    """
+    def parse(self, markdown: str) -> list:
+        return _markdown_tokens(markdown)
+
+REPORTS_DIR = "reports"
+# Report files are hn_{id}_{suffix}.md (the suffix is normally a timestamp);
+# each story's context is hn_{id}_context.json
+_REPORT_FILENAME_RE = re.compile(r"^hn_(\d+)_(?:(context)\.json|.*\.md)$")
+
+# story_id -> newest report path, and the ids that have a context file;
+# rebuilt when the reports directory changes
+_REPORT_INDEX: Optional[Dict[int, str]] = None
+_CONTEXT_IDS: Set[int] = set()
+_REPORT_INDEX_MTIME: Optional[int] = None
+
+def _invalidate_report_index() -> None:
+    global _REPORT_INDEX
+    _REPORT_INDEX = None
+
+def _refresh_report_index() -> bool:
+    """
+    Rebuilds the index from one scandir pass if the reports directory changed
+    since the last scan. Returns False when the directory does not exist.
+    """
+    global _REPORT_INDEX, _CONTEXT_IDS, _REPORT_INDEX_MTIME
+    try:
+        mtime = os.stat(REPORTS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    
+    if _REPORT_INDEX is None or mtime != _REPORT_INDEX_MTIME:
+        index = {}
+        contexts = set()
+        with os.scandir(REPORTS_DIR) as it:
+            for entry in it:
+                match = _REPORT_FILENAME_RE.match(entry.name)
+                if match is None:
+                    continue
+                sid = int(match.group(1))
+                if match.group(2):
+                    contexts.add(sid)
+                    continue
+                path = os.path.join(REPORTS_DIR, entry.name)
+                # Timestamped names sort chronologically; keep the newest
+                if sid not in index or path > index[sid]:
+                    index[sid] = path
+        _REPORT_INDEX = index
+        _CONTEXT_IDS = contexts
+        _REPORT_INDEX_MTIME = mtime
+    return True
+
+def _scan_reports(story_id: int) -> Tuple[Optional[str], bool]:
+    """Returns (newest saved report, context file exists) for a story."""
+    if not _refresh_report_index():
+        return None, False
+    return _REPORT_INDEX.get(story_id), story_id in _CONTEXT_IDS
+
+def _saved_story_ids() -> List[int]:
+    """Ids of all stories with a saved context file, newest id first."""
+    if not _refresh_report_index():
+        return []
+    return sorted(_CONTEXT_IDS, reverse=True)
+
+# context path -> (mtime_ns, story title), so the library only re-reads
+# context files that changed since it was last shown
+_LIBRARY_TITLES: Dict[str, Tuple[int, str]] = {}
+
+def _library_title(path: str, mtime_ns: int) -> str:
+    cached = _LIBRARY_TITLES.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    title = _read_context(path).get("story", {}).get("title", "Unknown Title")
+    _LIBRARY_TITLES[path] = (mtime_ns, title)
+    return title
+
+class _StoryPaths:
+    """File names of one story's saved data under REPORTS_DIR, built once."""
+    __slots__ = ("prefix", "context")
+
+    def __init__(self, story_id: int):
+        self.prefix = os.path.join(REPORTS_DIR, f"hn_{story_id}_")
+        self.context = self.prefix + "context.json"
+
+    def report(self, timestamp: str) -> str:
+        return f"{self.prefix}{timestamp}.md"
+
+def _chat_filename(context_filename: str) -> str:
+    """reports/hn_{id}_context.json -> reports/hn_{id}_chat.jsonl"""
+    return context_filename[:-len("_context.json")] + "_chat.jsonl"
+
+def _iter_chat(chat_filename: str):
+    """Yields chat messages from an append-only JSONL chat log."""
+    with open(chat_filename, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line)
+
+def _load_chat_history(context_filename: str, legacy_history=None) -> list:
+    chat_filename = _chat_filename(context_filename)
+    if not os.path.exists(chat_filename):
+        # Contexts saved before the chat log split kept the history inline
+        return list(legacy_history or [])
+    return list(_iter_chat(chat_filename))
+
+def _reset_chat(context_filename: str) -> None:
+    """Deletes the story's chat log; it belongs to the context being replaced."""
+    try:
+        os.remove(_chat_filename(context_filename))
+    except FileNotFoundError:
+        pass
+
+def _persist_chat(context_filename: str, chat_history: list, new_messages: int = 2) -> None:
+    """
+    Appends the latest turn to the story's chat log. The first write also
+    carries over any history that was loaded from a legacy context file.
+    """
+    chat_filename = _chat_filename(context_filename)
+    pending = chat_history[-new_messages:] if os.path.exists(chat_filename) else chat_history
+    # One compact orjson line per message, written with a single call
+    payload = b"".join(orjson.dumps(msg) + b"\n" for msg in pending)
+    with open(chat_filename, "ab") as f:
+        f.write(payload)
+
+# Blocking file helpers; the screens run them via asyncio.to_thread so disk
+# I/O never stalls the Textual event loop.
+
+def _read_report(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def _read_context(path: str) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """Writes data to a temporary file and renames it over path, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb", buffering=64 * 1024) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _write_report(path: str, text: str) -> None:
+    _atomic_write(path, text.encode("utf-8"))
+
+def _write_context(path: str, data: dict) -> None:
+    # Compact UTF-8 (no indentation, no \uXXXX escapes) encoded in one shot
+    _atomic_write(path, orjson.dumps(data))
+
+def _append_chat(path: str, question: str, answer: str, timestamp: str, provider_name: str) -> None:
+    payload = f"\n\n## Chat Log ({timestamp})\n**User**: {question}\n\n**{provider_name}**: {answer}\n"
+    # One encoded write instead of three through a text wrapper
+    with open(path, "ab", buffering=4096) as f:
+        f.write(payload.encode("utf-8"))
+
 class DashboardScreen(Screen):
     BINDINGS = [
         ("q", "quit", "Quit"), 
@@ -52,6 +243,8 @@ class DashboardScreen(Screen):
     def action_next_page(self):
         self.page += 1
         self.update_title()
+        # HNClient prefetches the page after the last one loaded, so this is
+        # usually served without a round-trip
         self.load_stories()
 
     def action_prev_page(self):
@@ -61,7 +254,7 @@ class DashboardScreen(Screen):
             self.load_stories()
 
     def action_refresh(self):
-        self.load_stories()
+        self.load_stories(refresh=True)
 
     def action_quit(self):
         self.app.exit()
@@ -72,36 +265,52 @@ class DashboardScreen(Screen):
     def action_library(self):
         self.app.push_screen(LibraryScreen())
 
-    @work
-    async def load_stories(self) -> None:
+    # Page loads share one exclusive group: a new page action cancels the
+    # load still in flight instead of racing it for the table
+    @work(exclusive=True, group="stories")
+    async def load_stories(self, refresh: bool = False) -> None:
         table = self.query_one(DataTable)
         table.loading = True
-        client = HNClient()
-        stories = await client.fetch_top_stories(page=self.page, limit=self.limit)
-        await client.close()
+        client = self.app.client
         
         table.clear()
-        start_rank = (self.page - 1) * self.limit + 1
-        for idx, story in enumerate(stories, start_rank):
-            table.add_row(
-                str(idx),
-                str(story.get("score", 0)),
-                story.get("title", "No Title"),
-                str(story.get("descendants", 0)),
-                str(story.get("id")),
-                key=str(story.get("id"))
-            )
+        rank = (self.page - 1) * self.limit + 1
+        pending = []
+        # Rows are added in rank order as stories arrive, ROW_CHUNK at a time
+        # in one batched refresh, yielding to the event loop between chunks.
+        # The top story is shown on its own and ends the loading state, so the
+        # table is usable while the rest stream in.
+        async for story in client.fetch_top_stories_iter(page=self.page, limit=self.limit, refresh=refresh):
+            pending.append(_story_row(rank, story))
+            rank += 1
+            if len(pending) == ROW_CHUNK or table.loading:
+                self._add_rows(table, pending)
+                pending = []
+                if table.loading:
+                    table.loading = False
+                    table.focus()
+                await asyncio.sleep(0)
+        self._add_rows(table, pending)
         table.loading = False
         table.focus()
 
+    def _add_rows(self, table: DataTable, rows: list) -> None:
+        """Adds (cells, key) rows under a single batched refresh."""
+        with self.app.batch_update():
+            for row, key in rows:
+                table.add_row(*row, key=key)
+
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         story_id = event.row_key.value
         self.app.push_screen(ProcessingScreen(story_id))
 
 class ProcessingScreen(Screen):
-    def __init__(self, story_id: str):
+    def __init__(self, story_id: str, refresh: bool = False):
         super().__init__()
         self.story_id = int(story_id)
+        # Retry Analysis: regenerate instead of reusing the analyzer's cached report
+        self.refresh = refresh
+        self.paths = _StoryPaths(self.story_id)
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -125,89 +334,80 @@ class ProcessingScreen(Screen):
         detail = self.query_one("#detail-label", Label)
         logging.info(f"Processing story ID: {self.story_id}")
         
-        # Check for existing report and context
-        report_pattern = f"reports/hn_{self.story_id}_*.md"
-        existing_reports = glob.glob(report_pattern)
-        
-        context_filename = f"reports/hn_{self.story_id}_context.json"
+        # Check for existing report and context in one (cached) directory scan
+        context_filename = self.paths.context
+        existing_report, context_exists = await asyncio.to_thread(_scan_reports, self.story_id)
         
         story = {}
-        article_text = ""
-        comments = []
         report = ""
         filename = ""
-        
-        client = HNClient()
 
-        if existing_reports and os.path.exists(context_filename):
-            # Cache Hit: Load everything from disk
+        if existing_report and context_exists:
+            # Cache Hit: Load from disk. No client, no network; the article and
+            # comments stay in the context file until ReportScreen needs them.
             status.update("Loading Cached Report...")
-            filename = existing_reports[0] # Take the first matching report
+            filename = existing_report
             
-            with open(filename, "r") as f:
-                report = f.read()
-                
-            with open(context_filename, "r") as f:
-                context = json.load(f)
-                story = context.get("story", {})
-                article_text = context.get("article_text", "")
-                comments = context.get("comments", [])
-                chat_history = context.get("chat_history", [])
-                
-            await client.close()
+            report, context = await asyncio.gather(
+                asyncio.to_thread(_read_report, filename),
+                asyncio.to_thread(_read_context, context_filename),
+            )
+            story = context.get("story", {})
+            chat_history = await asyncio.to_thread(_load_chat_history, context_filename, context.get("chat_history"))
             
         else:
             # Cache Miss (or partial): Fetch and Analyze
+            client = self.app.client
+            # Report exists but its context is missing (legacy or deleted json):
+            # the report is still needed for display, so read it off-thread
+            # while the network fetches run instead of afterwards.
+            report_read = asyncio.ensure_future(asyncio.to_thread(_read_report, existing_report)) if existing_report else None
             
             # 1. Fetch Story Details (if not loaded)
             if not story:
                 status.update("Fetching Story Details...")
-                story = await client.fetch_item(self.story_id)
+                # On retry, skip the item cache so new top-level comments (kids) are seen
+                story = await client.fetch_item(self.story_id, use_cache=not self.refresh)
             
-            # 2. Fetch Article Text
-            status.update("Fetching Article Content...")
+            # 2 + 3. Fetch Article Text and Top 100 Comments concurrently
+            status.update("Fetching Article Content & Top 100 Comments...")
             url = story.get("url", "")
-            detail.update(f"Downloading {url}...")
-            article_text = await client.fetch_article_text(url)
-            
-            # 3. Fetch Comments
-            status.update("Fetching Top 100 Comments...")
-            detail.update("Traversing comment tree...")
-            comments = await client.fetch_comments(story.get("kids", []), limit=100)
-            
-            await client.close()
+            detail.update(f"Downloading {url} and traversing comment tree...")
+            article_text, comments = await client.fetch_story_bundle(story, comment_limit=100)
             
             # 4. Analyze (only if we don't have a report yet)
-            if not existing_reports:
-                provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-                status.update(f"🤖 {provider_name} is Analyzing...")
+            if not existing_report:
+                status.update(f"🤖 {_PROVIDER_NAME} is Analyzing...")
                 detail.update("Generating summary report...")
-                report = await analyzer.generate_report(story, article_text, comments)
+                report = await analyzer.generate_report(story, article_text, comments, use_cache=not self.refresh)
                 
-                # Save to file
                 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"reports/hn_{self.story_id}_{timestamp}.md"
-                with open(filename, "w") as f:
-                    f.write(report)
+                filename = self.paths.report(timestamp)
             else:
-                 # We have report but no context json? (Legacy case handling or deleted json)
-                 # We fetched data, so let's load the existing report
-                 filename = existing_reports[0]
-                 with open(filename, "r") as f:
-                    report = f.read()
-
-            # Save Context JSON (always ensure it exists if we fetched data)
-            with open(context_filename, "w") as f:
-                json.dump({
-                    "story": story,
-                    "article_text": article_text,
-                    "comments": comments,
-                    "chat_history": []
-                }, f, indent=2)
+                 filename = existing_report
+                 report = await report_read
+
+            # Save Context JSON (always ensure it exists if we fetched data).
+            # It is immutable from here on; chat turns go to the JSONL chat log.
+            # Written before the report, so a new report never lacks its context.
+            await asyncio.to_thread(_write_context, context_filename, {
+                "story": story,
+                "article_text": article_text,
+                "comments": comments,
+            })
+            if not existing_report:
+                await asyncio.to_thread(_write_report, filename, report)
+            _invalidate_report_index()
+            # A rewritten context starts a new conversation: the old Q&A was
+            # about the previous fetch, and the chat session is rebuilt from
+            # the context just written
+            await asyncio.to_thread(_reset_chat, context_filename)
+            analyzer.drop_story_session(self.story_id)
+            chat_history = []
             
         # Transition
         self.app.pop_screen()
-        self.app.push_screen(ReportScreen(story, article_text, comments, report, filename, context_filename, chat_history if 'chat_history' in locals() else []))
+        self.app.push_screen(ReportScreen(story, report, filename, context_filename, chat_history))
 
 class ArticleScreen(Screen):
     BINDINGS = [
@@ -223,11 +423,15 @@ class ArticleScreen(Screen):
         yield Header()
         yield Container(
             Label(self.title_text, classes="header-label"),
-            Markdown(self.content, id="article-view"),
+            Markdown(id="article-view"),
             id="article-container"
         )
         yield Footer()
 
+    def on_mount(self) -> None:
+        # Paint the screen first, then parse and mount the article
+        self.call_after_refresh(self.query_one("#article-view", Markdown).update, self.content)
+
     def action_back(self):
         self.app.pop_screen()
 
@@ -241,26 +445,54 @@ class ReportScreen(Screen):
         ("r", "retry", "Retry Analysis"),
     ]
 
-    def __init__(self, story, article_text, comments, report_md, filename, context_filename, chat_history):
+    def __init__(self, story, report_md, filename, context_filename, chat_history):
         super().__init__()
         self.story = story
-        self.article_text = article_text
-        self.comments = comments
+        # Article text and comments stay on disk in the context file; they are
+        # read only to view the article or to build the chat session.
         self.report_md = report_md
         self.filename = filename
         self.context_filename = context_filename
         self.chat_history = chat_history
+        # Settings are not reachable from this screen, so the provider is fixed
+        self.provider_name = _PROVIDER_NAME
         self.select_mode = False
+        # True when the select-mode TextArea is behind the chat history
+        self._select_dirty = True
+        # separator -> (messages covered, transcript text)
+        self._transcripts: Dict[str, tuple] = {}
         self.is_error = report_md.startswith("ANALYSIS_ERROR:")
 
-    def action_view_article(self) -> None:
+    # Chat widgets, looked up once instead of on every turn
+    @functools.cached_property
+    def _log(self) -> RichLog:
+        return self.query_one("#chat-log", RichLog)
+
+    @functools.cached_property
+    def _input(self) -> Input:
+        return self.query_one("#chat-input", Input)
+
+    @functools.cached_property
+    def _text_area(self) -> TextArea:
+        return self.query_one("#chat-text-area", TextArea)
+
+    @functools.cached_property
+    def _chat_status(self) -> Static:
+        return self.query_one("#chat-status", Static)
+
+    async def _load_context(self):
+        context = await asyncio.to_thread(_read_context, self.context_filename)
+        return context.get("article_text", ""), context.get("comments", [])
+
+    async def action_view_article(self) -> None:
         title = self.story.get("title", "Article")
-        self.app.push_screen(ArticleScreen(self.article_text, title))
+        article_text, _ = await self._load_context()
+        self.app.push_screen(ArticleScreen(article_text, title))
 
     async def action_copy_last(self) -> None:
         # Check if we are in select mode and have a selection
         if self.select_mode:
-            text_area = self.query_one("#chat-text-area", TextArea)
+            text_area = self._text_area
             if text_area.selection:
                 # Textual TextArea handles ctrl+c natively for copy, 
                 # but if we bound it to this action, we intercepted it.
@@ -280,12 +512,7 @@ class ReportScreen(Screen):
         self.notify("No assistant response to copy.", severity="warning")
 
     def action_copy_all(self) -> None:
-        full_log = ""
-        for msg in self.chat_history:
-            provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-            role = "You" if msg.get('role') == 'user' else provider_name
-            content = msg.get('content', '')
-            full_log += f"{role}: {content}\n\n"
+        full_log = self._chat_transcript(": ")
         
         if full_log:
             self.app.copy_to_clipboard(full_log)
@@ -293,21 +520,33 @@ class ReportScreen(Screen):
         else:
              self.notify("Chat history is empty.", severity="warning")
 
+    def _chat_transcript(self, separator: str) -> str:
+        """
+        Joins the chat history into one "Role<separator>content" block per message.
+        The history only grows, so a cached transcript is extended with just the
+        messages added since it was built.
+        """
+        count, text = self._transcripts.get(separator, (0, ""))
+        if count > len(self.chat_history):
+            count, text = 0, ""
+        if count < len(self.chat_history):
+            text += "".join(
+                f"{'You' if msg.get('role') == 'user' else self.provider_name}{separator}{msg.get('content', '')}\n\n"
+                for msg in self.chat_history[count:]
+            )
+            self._transcripts[separator] = (len(self.chat_history), text)
+        return text
+
     def action_toggle_select(self) -> None:
         self.select_mode = not self.select_mode
-        rich_log = self.query_one("#chat-log", RichLog)
-        text_area = self.query_one("#chat-text-area", TextArea)
+        rich_log = self._log
+        text_area = self._text_area
         
         if self.select_mode:
-            # Populate TextArea and show it
-            full_log = ""
-            for msg in self.chat_history:
-                provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-                role = "You" if msg.get('role') == 'user' else provider_name
-                content = msg.get('content', '')
-                full_log += f"{role}:\n{content}\n\n"
-            
-            text_area.text = full_log
+            # Populate TextArea (only if turns arrived since it was last built) and show it
+            if self._select_dirty:
+                text_area.text = self._chat_transcript(":\n")
+                self._select_dirty = False
             rich_log.display = False
             text_area.display = True
             text_area.focus()
@@ -316,7 +555,7 @@ class ReportScreen(Screen):
             # Show RichLog
             text_area.display = False
             rich_log.display = True
-            self.query_one("#chat-input").focus()
+            self._input.focus()
             self.notify("Select Mode: OFF")
 
     def compose(self) -> ComposeResult:
@@ -324,13 +563,14 @@ class ReportScreen(Screen):
         yield Container(
             Vertical(
                 Label(f"📄 Report: {self.filename}", classes="header-label"),
-                Markdown(self.report_md, id="markdown-view"),
+                Markdown(id="markdown-view", parser_factory=_CachedMarkdownParser),
                 id="report-pane"
             ),
             Vertical(
                 Label("💬 Chat", classes="header-label"),
                 RichLog(id="chat-log", markup=True, wrap=True),
                 TextArea(id="chat-text-area", read_only=True),
+                Static("", id="chat-status"),
                 Input(placeholder="Ask about specific arguments...", id="chat-input"),
                 id="chat-pane"
             ),
@@ -345,17 +585,18 @@ class ReportScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
+        # Paint headers and the chat pane first, then parse and mount the report
+        self.call_after_refresh(self.query_one("#markdown-view", Markdown).update, self.report_md)
         if self.chat_history:
-            log = self.query_one(RichLog)
+            log = self._log
             for msg in self.chat_history:
                 role = msg.get('role')
                 content = msg.get('content')
                 if role == 'user':
                     log.write(f"[bold green]You:[/bold green] {content}")
                 elif role == 'assistant':
-                    provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-                    log.write(f"[bold blue]{provider_name}:[/bold blue]")
-                    log.write(RichMarkdown(content))
+                    log.write(f"[bold blue]{self.provider_name}:[/bold blue]")
+                    log.write(_chat_markdown(content))
                     log.write("-" * 20)
 
     @on(Input.Submitted)
@@ -364,8 +605,8 @@ class ReportScreen(Screen):
         if not question.strip():
             return
             
-        log = self.query_one(RichLog)
-        input_widget = self.query_one(Input)
+        log = self._log
+        input_widget = self._input
         
         log.write(f"[bold green]You:[/bold green] {question}")
         input_widget.value = ""
@@ -378,68 +619,56 @@ class ReportScreen(Screen):
         await self._run_chat_query_implementation(question)
 
     async def _run_chat_query_implementation(self, question: str) -> None:
-        log = self.query_one(RichLog)
+        log = self._log
         
-        # Add a placeholder for the response
-        provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-        log.write(f"[italic gray]{provider_name} is thinking...[/italic gray]")
+        # Transient status line, so the log only ever holds the conversation
+        self._chat_status.update(f"[italic gray]{self.provider_name} is thinking...[/italic gray]")
+        self._chat_status.display = True
         
         try:
             answer = await analyzer.chat_with_context(
                 self.story, 
-                self.article_text, 
-                self.comments, 
+                None, 
+                None, 
                 question, 
-                self.chat_history
+                self.chat_history,
+                context_loader=self._load_context
             )
             
-            # Remove the "thinking" message by clearing if possible, 
-            # but RichLog doesn't easily allow removing last line. 
-            # We'll just append the answer.
-            
             self.chat_history.append({'role': 'user', 'content': question})
             self.chat_history.append({'role': 'assistant', 'content': answer})
             
-            provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-            log.write(f"[bold blue]{provider_name}:[/bold blue]")
-            log.write(RichMarkdown(answer))
+            log.write(f"[bold blue]{self.provider_name}:[/bold blue]")
+            log.write(_chat_markdown(answer))
             log.write("-" * 20)
             
-            # If in select mode, update it (though it might be jarring, so maybe wait for toggle)
+            # In select mode append just the new turn, keeping cursor and selection;
+            # otherwise rebuild the TextArea on the next toggle
             if self.select_mode:
-                provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-                text_area = self.query_one("#chat-text-area", TextArea)
-                text_area.text += f"\nYou:\n{question}\n\n{provider_name}:\n{answer}\n\n"
+                text_area = self._text_area
+                text_area.insert(f"You:\n{question}\n\n{self.provider_name}:\n{answer}\n\n", location=text_area.document.end)
+            else:
+                self._select_dirty = True
             
             # Append to Report File
             try:
                 timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                with open(self.filename, "a") as f:
-                    provider_name = os.getenv("LLM_PROVIDER", "Ollama").capitalize()
-                    f.write(f"\n\n## Chat Log ({timestamp})\n")
-                    f.write(f"**User**: {question}\n\n")
-                    f.write(f"**{provider_name}**: {answer}\n")
+                await asyncio.to_thread(_append_chat, self.filename, question, answer, timestamp, self.provider_name)
             except Exception as e:
                 log.write(f"[bold red]Error saving chat to report:[/bold red] {escape(str(e))}")
 
-            # Save to Context JSON
+            # Append the turn to the chat log (the context JSON is never rewritten)
             try:
-                if os.path.exists(self.context_filename):
-                    with open(self.context_filename, "r") as f:
-                        data = json.load(f)
-                    
-                    data["chat_history"] = self.chat_history
-                    
-                    with open(self.context_filename, "w") as f:
-                        json.dump(data, f, indent=2)
+                await asyncio.to_thread(_persist_chat, self.context_filename, list(self.chat_history))
             except Exception as e:
                  log.write(f"[bold red]Error saving chat context:[/bold red] {escape(str(e))}")
 
         except Exception as e:
             log.write(f"[bold red]Error:[/bold red] {escape(str(e))}")
         finally:
-            self.query_one(Input).disabled = False
-            self.query_one(Input).focus()
+            self._chat_status.display = False
+            self._input.disabled = False
+            self._input.focus()
 
     async def action_retry(self) -> None:
         await self._retry_implementation()
@@ -449,10 +678,11 @@ class ReportScreen(Screen):
         await self._retry_implementation()
 
     async def _retry_implementation(self) -> None:
-        # Delete the failed report file
-        if os.path.exists(self.filename):
+        # Delete the report file so it is regenerated
+        if await asyncio.to_thread(os.path.exists, self.filename):
             try:
-                os.remove(self.filename)
+                await asyncio.to_thread(os.remove, self.filename)
+                _invalidate_report_index()
                 logging.info(f"Deleted failed report: {self.filename}")
             except Exception as e:
                 self.notify(f"Error deleting report: {e}", severity="error")
@@ -460,7 +690,7 @@ class ReportScreen(Screen):
 
         # Pop the current ReportScreen and push ProcessingScreen (to start over)
         self.app.pop_screen()
-        self.app.push_screen(ProcessingScreen(str(self.story.get("id"))))
+        self.app.push_screen(ProcessingScreen(str(self.story.get("id")), refresh=True))
 
     def action_back(self) -> None:
         self.app.pop_screen()
@@ -495,31 +725,23 @@ class LibraryScreen(Screen):
         table = self.query_one("#library-table", DataTable)
         table.clear()
         
-        # Find all context files
-        context_files = glob.glob("reports/hn_*_context.json")
+        # Saved stories come from the cached directory index; titles are only
+        # re-read from context files that changed
         entries = []
         
-        for cf in context_files:
+        for sid in _saved_story_ids():
+            cf = _StoryPaths(sid).context
             try:
-                # Extract ID from filename hn_ID_context.json
-                basename = os.path.basename(cf)
-                story_id = basename.split("_")[1]
-                
                 # Get modified time as saved date
-                mtime = os.path.getmtime(cf)
-                saved_date = datetime.datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
-                
-                with open(cf, "r") as f:
-                    data = json.load(f)
-                    title = data.get("story", {}).get("title", "Unknown Title")
+                st = os.stat(cf)
+                saved_date = datetime.datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M")
+                title = _library_title(cf, st.st_mtime_ns)
                 
-                entries.append((story_id, title, saved_date, cf))
+                entries.append((str(sid), title, saved_date, cf))
             except Exception:
                 continue
         
-        # Sort by ID descending (usually reflects latest)
-        entries.sort(key=lambda x: int(x[0]), reverse=True)
-        
+        # Already sorted by ID descending (usually reflects latest)
         for entry in entries:
             table.add_row(entry[0], entry[1], entry[2], key=entry[3])
         
@@ -550,7 +772,7 @@ class LibraryDetailScreen(Screen):
             ),
             Vertical(
                 Label("📝 Summary Report", classes="header-label"),
-                Markdown("", id="lib-summary-view"),
+                Markdown("", id="lib-summary-view", parser_factory=_CachedMarkdownParser),
                 id="chat-pane" 
             ),
             classes="split-view"
@@ -566,22 +788,19 @@ class LibraryDetailScreen(Screen):
 
     def load_data(self) -> None:
         try:
-            with open(self.context_filename, "r") as f:
-                context = json.load(f)
-                self.story = context.get("story", {})
-                self.article_text = context.get("article_text", "")
-                self.comments = context.get("comments", [])
-                self.chat_history = context.get("chat_history", [])
+            context = _read_context(self.context_filename)
+            self.story = context.get("story", {})
+            self.article_text = context.get("article_text", "")
+            self.chat_history = _load_chat_history(self.context_filename, context.get("chat_history"))
             
-            # Find the report MD file
-            report_pattern = f"reports/hn_{self.story_id}_*.md"
-            existing_reports = sorted(glob.glob(report_pattern), reverse=True)
+            # Find the newest report MD file (from the cached directory index)
+            existing_report, _ = _scan_reports(int(self.story_id))
             
             report_md = ""
             self.report_filename = ""
-            if existing_reports:
-                self.report_filename = existing_reports[0]
-                with open(self.report_filename, "r") as f:
+            if existing_report:
+                self.report_filename = existing_report
+                with open(self.report_filename, "r", encoding="utf-8") as f:
                     report_md = f.read()
             else:
                 report_md = "No summary report found for this article."
@@ -597,16 +816,14 @@ class LibraryDetailScreen(Screen):
 
     def action_open_chat(self):
         # Push ReportScreen
-        # def __init__(self, story, article_text, comments, report_md, filename, context_filename, chat_history):
+        # def __init__(self, story, report_md, filename, context_filename, chat_history):
         
         # Reload report to be sure we have latest
-        with open(self.report_filename, "r") as f:
+        with open(self.report_filename, "r", encoding="utf-8") as f:
             report_md = f.read()
 
         self.app.push_screen(ReportScreen(
             self.story, 
-            self.article_text, 
-            self.comments, 
             report_md, 
             self.report_filename, 
             self.context_filename, 
@@ -689,6 +906,7 @@ class SettingsScreen(Screen):
         success = analyzer.set_provider(provider, model=model, api_key=api_key)
         
         if success:
+            _refresh_provider_name()
             self.notify(f"Settings Saved! Using {provider} ({model})")
             self.app.pop_screen()
         else:
@@ -781,6 +999,11 @@ class HNApp(App):
         background: $surface;
         display: none;
     }
+
+    #chat-status {
+        height: auto;
+        display: none;
+    }
     
     #markdown-view {
         padding: 1;
@@ -823,9 +1046,25 @@ class HNApp(App):
     }
     """
 
+    def __init__(self):
+        super().__init__()
+        self._client: Optional[HNClient] = None
+
+    @property
+    def client(self) -> HNClient:
+        """The HNClient shared by all screens, so its connection pool is reused."""
+        if self._client is None:
+            self._client = HNClient()
+        return self._client
+
     def on_mount(self) -> None:
         self.push_screen(DashboardScreen())
 
+    async def on_unmount(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
 if __name__ == "__main__":
     app = HNApp()
     app.run()
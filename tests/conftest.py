@@ -0,0 +1,23 @@
+import pytest_asyncio
+from src.hn import HNClient
+
+# uvloop is optional (no Windows builds); without it tests use the stock loop
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "network: talks to the live Hacker News API (run with -m network)")
+
+if HAS_UVLOOP:
+    def pytest_asyncio_loop_factories(config, item):
+        # Every async test and fixture runs on a uvloop event loop
+        return {"uvloop": uvloop.new_event_loop}
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def hn_client():
+    # One client (and connection pool) for every network test in the run
+    async with HNClient() as client:
+        yield client
@@ -1,25 +1,21 @@
+import asyncio
 import pytest
-from src.hn import HNClient
 
-@pytest.mark.asyncio
-async def test_fetch_top_stories():
-    client = HNClient()
-    try:
-        stories = await client.fetch_top_stories(limit=5)
-        assert len(stories) <= 5
-        if stories:
-            assert "title" in stories[0]
-            assert "id" in stories[0]
-    finally:
-        await client.close()
-
-@pytest.mark.asyncio
-async def test_fetch_item():
-    client = HNClient()
-    try:
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+async def test_hn_smoke(hn_client):
+    # Both requests share the session client, so their round trips overlap
+    async with asyncio.TaskGroup() as tg:
+        top = tg.create_task(hn_client.fetch_top_stories(limit=5))
         # Fetch item 1 (the first HN item)
-        item = await client.fetch_item(1)
-        assert item["id"] == 1
-        assert "by" in item
-    finally:
-        await client.close()
+        first = tg.create_task(hn_client.fetch_item(1))
+    
+    stories = top.result()
+    assert len(stories) <= 5
+    if stories:
+        assert "title" in stories[0]
+        assert "id" in stories[0]
+    
+    item = first.result()
+    assert item["id"] == 1
+    assert "by" in item
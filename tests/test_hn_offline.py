@@ -0,0 +1,66 @@
+import asyncio
+import httpx
+import orjson
+import pytest
+from src.hn import HNClient
+
+TOP_IDS = [101, 102, 103]
+ITEMS = {
+    101: {"id": 101, "type": "story", "by": "alice", "title": "First", "kids": [201]},
+    102: {"id": 102, "type": "story", "by": "bob", "title": "Second"},
+    103: {"id": 103, "type": "story", "by": "carol", "title": "Third"},
+    201: {"id": 201, "type": "comment", "by": "dave", "text": "Nice"},
+}
+
+def _firebase(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path == "/v0/topstories.json":
+        return httpx.Response(200, content=orjson.dumps(TOP_IDS))
+    item_id = int(path.rsplit("/", 1)[-1].removesuffix(".json"))
+    return httpx.Response(200, content=orjson.dumps(ITEMS.get(item_id)))
+
+@pytest.mark.asyncio
+async def test_hn_client_offline():
+    async with HNClient(transport=httpx.MockTransport(_firebase)) as hn:
+        stories = await hn.fetch_top_stories(limit=2)
+        assert [story["id"] for story in stories] == [101, 102]
+        assert stories[0]["title"] == "First"
+        
+        item = await hn.fetch_item(201)
+        assert item["by"] == "dave"
+
+@pytest.mark.asyncio
+async def test_concurrent_item_fetches_share_one_request():
+    hits = []
+    
+    def _counting(request: httpx.Request) -> httpx.Response:
+        hits.append(request.url.path)
+        return _firebase(request)
+    
+    async with HNClient(transport=httpx.MockTransport(_counting)) as hn:
+        items = await asyncio.gather(hn.fetch_item(101), hn.fetch_item(101), hn.fetch_item(101))
+        assert [item["id"] for item in items] == [101, 101, 101]
+        assert hits == ["/v0/item/101.json"]
+
+@pytest.mark.asyncio
+async def test_comment_depth_does_not_touch_cached_items():
+    async with HNClient(transport=httpx.MockTransport(_firebase)) as hn:
+        comments = await hn.fetch_comments([101])
+        assert [(c["id"], c["depth"]) for c in comments] == [(101, 0), (201, 1)]
+        
+        # The same comment reached as a root gets its own depth
+        comments = await hn.fetch_comments([201])
+        assert comments[0]["depth"] == 0
+        assert "depth" not in await hn.fetch_item(201)
+
+@pytest.mark.asyncio
+async def test_fetch_item_can_bypass_the_cache():
+    scores = iter([1, 2])
+    
+    def _voting(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=orjson.dumps({"id": 102, "type": "story", "score": next(scores)}))
+    
+    async with HNClient(transport=httpx.MockTransport(_voting)) as hn:
+        assert (await hn.fetch_item(102))["score"] == 1
+        assert (await hn.fetch_item(102))["score"] == 1
+        assert (await hn.fetch_item(102, use_cache=False))["score"] == 2
@@ -2,19 +2,23 @@ import os
 import csv
 import logging
 import sys
+import tempfile
 sys.path.append(os.getcwd())
-from src.logger import setup_logging, log_usage, APP_LOG_DIR, STATS_FILE
+from src import logger
+from src.logger import setup_logging, log_usage, flush_usage, flush_logs
 
-def test_logging_system():
+def test_logging_system(tmp_path):
     print("🧪 Testing Logging System...")
     
-    # 1. Setup
-    setup_logging()
+    # 1. Setup, in a directory of our own so parallel workers don't share files
+    setup_logging(log_dir=str(tmp_path))
+    APP_LOG_DIR, APP_LOG_PATH, STATS_FILE = logger.APP_LOG_DIR, logger.APP_LOG_PATH, logger.STATS_FILE
+    assert APP_LOG_DIR.startswith(str(tmp_path))
     
     # 2. Verify Directories
     assert os.path.exists(APP_LOG_DIR), "App log directory should exist"
     assert os.path.exists(os.path.dirname(STATS_FILE)), "Stats log directory should exist"
-    assert os.path.exists(os.path.join(APP_LOG_DIR, "app.log")), "App log file should exist"
+    assert os.path.exists(APP_LOG_PATH), "App log file should exist"
     assert os.path.exists(STATS_FILE), "Stats file should exist"
     
     print("✅ Directories and files created.")
@@ -22,8 +26,9 @@ def test_logging_system():
     # 3. Test App Logging
     test_message = "Test log message"
     logging.info(test_message)
+    flush_logs()
     
-    with open(os.path.join(APP_LOG_DIR, "app.log"), "r") as f:
+    with open(APP_LOG_PATH, "r") as f:
         content = f.read()
         assert test_message in content, "App log should contain test message"
         
@@ -37,6 +42,7 @@ def test_logging_system():
         duration_s=1.5,
         operation_type="test"
     )
+    flush_usage()
     
     with open(STATS_FILE, "r") as f:
         reader = csv.reader(f)
@@ -53,4 +59,4 @@ def test_logging_system():
     print("✅ Verification Complete.")
 
 if __name__ == "__main__":
-    test_logging_system()
+    test_logging_system(tempfile.mkdtemp())
@@ -1,7 +1,24 @@
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
+from google.genai import errors
 from src.analyze import GeminiProvider
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+class FakeUsage:
+    __slots__ = ("prompt_token_count", "candidates_token_count")
+
+    def __init__(self, prompt_token_count: int = 10, candidates_token_count: int = 20):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+class FakeResponse:
+    """The slice of a generate_content response GeminiProvider.chat reads."""
+    __slots__ = ("text", "usage_metadata")
+
+    def __init__(self, text: str = "Success report", usage_metadata: FakeUsage = None):
+        self.text = text
+        self.usage_metadata = usage_metadata or FakeUsage()
 
 @pytest.mark.asyncio
 async def test_gemini_provider_retries_on_failure():
@@ -18,19 +35,35 @@ async def test_gemini_provider_retries_on_failure():
         mock_generate_content.side_effect = [
             Exception("503 UNAVAILABLE"),
             Exception("503 UNAVAILABLE"),
-            MagicMock(text="Success report", usage_metadata=MagicMock(prompt_token_count=10, candidates_token_count=20))
+            FakeResponse()
         ]
         
         provider = GeminiProvider(api_key="test_key", model_name="test_model")
         
         messages = [{'role': 'user', 'content': 'hello'}]
-        # Need to patch types.Content and types.Part as well or avoid real calls
-        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'):
+        # Need to patch types.Content and types.Part as well or avoid real calls.
+        # tenacity's backoff goes through asyncio.sleep; mock it so no real time passes.
+        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'), \
+             patch('src.analyze.asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+             patch('tenacity.wait.random.uniform', return_value=0.25):
             response = await provider.chat(messages)
         
         assert response['content'] == "Success report"
-        # Verify it was called 3 times
+        # Verify it was called 3 times, backing off between attempts
         assert mock_generate_content.call_count == 3
+        assert mock_sleep.await_count == 2
+        
+        # Exponential backoff plus jitter, capped at 30s
+        delays = [call.args[0] for call in mock_sleep.await_args_list]
+        assert delays == [1.25, 2.25]
+        assert all(delay <= 30 for delay in delays)
+        
+        # Every retry carries the request id of the original call
+        request_ids = {
+            call.kwargs['config'].http_options.headers['x-request-id']
+            for call in mock_generate_content.call_args_list
+        }
+        assert len(request_ids) == 1
 
 @pytest.mark.asyncio
 async def test_gemini_provider_fails_after_max_retries():
@@ -43,15 +76,119 @@ async def test_gemini_provider_fails_after_max_retries():
         mock_generate_content = AsyncMock()
         mock_client.aio.models.generate_content = mock_generate_content
         
-        # Configure the mock to always fail
-        mock_generate_content.side_effect = Exception("Persistent error")
+        # Configure the mock to always fail with a retryable error
+        mock_generate_content.side_effect = errors.ServerError(503, {'error': {'code': 503, 'message': 'Persistent error', 'status': 'UNAVAILABLE'}})
         
-        provider = GeminiProvider(api_key="test_key", model_name="test_model")
+        # Trip after a single exhausted call so the follow-up call is short-circuited
+        provider = GeminiProvider(api_key="test_key", model_name="test_model", breaker=CircuitBreaker(failure_threshold=1))
         
         messages = [{'role': 'user', 'content': 'hello'}]
-        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'):
-            with pytest.raises(Exception, match="Persistent error"):
+        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'), \
+             patch('src.analyze.asyncio.sleep', new_callable=AsyncMock):
+            with pytest.raises(errors.ServerError, match="Persistent error"):
                 await provider.chat(messages)
         
         # tenacity is configured for 3 attempts (1 initial + 2 retries)
         assert mock_generate_content.call_count == 3
+        
+        # The exhausted retries opened the circuit: the next call fails fast
+        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'):
+            with pytest.raises(CircuitOpenError):
+                await provider.chat(messages)
+        assert mock_generate_content.call_count == 3
+
+@pytest.mark.asyncio
+async def test_gemini_provider_does_not_retry_permanent_errors():
+    with patch('src.analyze.genai.Client') as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        
+        mock_generate_content = AsyncMock()
+        mock_client.aio.models.generate_content = mock_generate_content
+        
+        # An auth failure won't go away by asking again
+        mock_generate_content.side_effect = errors.ClientError(403, {'error': {'code': 403, 'message': 'Permission denied', 'status': 'PERMISSION_DENIED'}})
+        
+        provider = GeminiProvider(api_key="test_key", model_name="test_model")
+        
+        messages = [{'role': 'user', 'content': 'hello'}]
+        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'), \
+             patch('src.analyze.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(errors.ClientError, match="Permission denied"):
+                await provider.chat(messages)
+        
+        assert mock_generate_content.call_count == 1
+        assert mock_sleep.await_count == 0
+
+@pytest.mark.asyncio
+async def test_gemini_provider_ignores_status_like_numbers_in_messages():
+    with patch('src.analyze.genai.Client') as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        
+        mock_generate_content = AsyncMock()
+        mock_client.aio.models.generate_content = mock_generate_content
+        
+        # 503 here is a token count, not a status code
+        mock_generate_content.side_effect = Exception("Prompt is 503 tokens over the limit")
+        
+        provider = GeminiProvider(api_key="test_key", model_name="test_model")
+        
+        messages = [{'role': 'user', 'content': 'hello'}]
+        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'), \
+             patch('src.analyze.asyncio.sleep', new_callable=AsyncMock):
+            with pytest.raises(Exception, match="tokens over the limit"):
+                await provider.chat(messages)
+        
+        assert mock_generate_content.call_count == 1
+
+@pytest.mark.asyncio
+async def test_gemini_provider_half_open_trial_closes_on_client_error():
+    with patch('src.analyze.genai.Client') as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        
+        mock_generate_content = AsyncMock()
+        mock_client.aio.models.generate_content = mock_generate_content
+        
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        provider = GeminiProvider(api_key="test_key", model_name="test_model", breaker=breaker)
+        
+        messages = [{'role': 'user', 'content': 'hello'}]
+        now = [1000.0]
+        with patch('src.analyze.types.Content'), patch('src.analyze.types.Part.from_text'), \
+             patch('src.analyze.asyncio.sleep', new_callable=AsyncMock), \
+             patch('src.circuit_breaker.time.monotonic', side_effect=lambda: now[0]):
+            mock_generate_content.side_effect = errors.ServerError(503, {'error': {'code': 503, 'message': 'Overloaded', 'status': 'UNAVAILABLE'}})
+            with pytest.raises(errors.ServerError):
+                await provider.chat(messages)
+            assert breaker.state == "open"
+            
+            # After the reset timeout one trial goes through; a 4xx means the API is answering
+            now[0] += 31
+            assert breaker.state == "half-open"
+            mock_generate_content.side_effect = errors.ClientError(400, {'error': {'code': 400, 'message': 'Bad request', 'status': 'INVALID_ARGUMENT'}})
+            with pytest.raises(errors.ClientError):
+                await provider.chat(messages)
+            assert breaker.state == "closed"
+            
+            mock_generate_content.side_effect = None
+            mock_generate_content.return_value = FakeResponse()
+            response = await provider.chat(messages)
+        
+        assert response['content'] == "Success report"
+        assert mock_generate_content.call_count == 5
+
+def test_circuit_breaker_cancelled_trial_frees_the_next_call():
+    now = [1000.0]
+    with patch('src.circuit_breaker.time.monotonic', side_effect=lambda: now[0]):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        now[0] += 31
+        breaker.before_call()
+        # While the trial is in flight everyone else fails fast
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.release_trial()
+        assert breaker.state == "half-open"
+        breaker.before_call()